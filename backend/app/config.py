@@ -36,6 +36,15 @@ class Settings(BaseSettings):
     # API配置（支持自定义API）
     api_key: Optional[str] = None
     api_base_url: Optional[str] = None
+
+    # 模型列表缓存时间（秒）
+    models_cache_ttl: int = 300
+
+    # 提纲生成是否使用 json_schema 结构化输出（接口不支持时自动降级为 json_object）
+    structured_output: bool = True
+
+    # 正文生成时同时请求的叶子章节数量上限
+    content_concurrency: int = 8
     
     class Config:
         env_file = ".env"
@@ -96,4 +96,9 @@ class WordExportRequest(BaseModel):
     """Word导出请求"""
     project_name: Optional[str] = Field(None, description="项目名称")
     project_overview: Optional[str] = Field(None, description="项目概述")
-    outline: List[OutlineItem] = Field(..., description="目录结构，包含内容")
\ No newline at end of file
+    outline: List[OutlineItem] = Field(..., description="目录结构，包含内容")
+
+
+class QueueControlRequest(BaseModel):
+    """队列启停请求（请求体可为空，后续的启停配置项在此扩展）"""
+    model_config = {"extra": "forbid"}
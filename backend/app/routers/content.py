@@ -81,4 +81,38 @@ async def generate_chapter_content_stream(request: ChapterContentRequest):
         return sse_response(generate())
         
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"章节内容生成失败: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"章节内容生成失败: {str(e)}")
+
+
+@router.post("/generate-outline-stream")
+async def generate_outline_content_stream(request: ContentGenerationRequest):
+    """流式为整个目录的所有叶子章节生成内容，每个章节的内容片段生成后立即推送"""
+    try:
+        # 加载配置
+        config = config_manager.load_config()
+        
+        if not config.get('api_key'):
+            raise HTTPException(status_code=400, detail="请先配置OpenAI API密钥")
+
+        # 创建OpenAI服务实例
+        openai_service = OpenAIService()
+        
+        async def generate():
+            try:
+                async for event in openai_service.generate_content_for_outline(
+                    outline=request.outline,
+                    project_overview=request.project_overview
+                ):
+                    yield f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+                
+            except Exception as e:
+                # 发送错误信息
+                yield f"data: {json.dumps({'status': 'error', 'message': str(e)}, ensure_ascii=False)}\n\n"
+            
+            # 发送结束信号
+            yield "data: [DONE]\n\n"
+        
+        return sse_response(generate())
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"目录内容生成失败: {str(e)}")
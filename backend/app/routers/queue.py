@@ -1,9 +1,24 @@
 """队列状态查询API路由"""
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ValidationError
+from typing import Type, TypeVar
+from ..models.schemas import QueueControlRequest
 from ..utils.queue_manager import queue_manager
 import json
 
-router = APIRouter(prefix="/api/queue", tags=["队列管理"])
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+router = APIRouter(prefix="/api/queue", tags=["队列管理"], default_response_class=ORJSONResponse)
+
+
+async def _parse_body(request: Request, model: Type[ModelT]) -> ModelT:
+    """直接用 model_validate_json 解析原始请求体（单次解析，不经过中间dict），空请求体视为 {}"""
+    body = await request.body()
+    try:
+        return model.model_validate_json(body or b"{}")
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=f"请求参数错误: {str(e)}")
 
 
 @router.get("/status/{task_id}")
@@ -23,14 +38,16 @@ async def get_all_tasks_status():
     """获取所有任务状态"""
     try:
         tasks = await queue_manager.get_all_tasks()
-        return {"tasks": tasks}
+        # 任务状态均为内部生成的普通dict，直接用orjson序列化，跳过jsonable_encoder
+        return ORJSONResponse(content={"tasks": tasks})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取任务列表失败: {str(e)}")
 
 
 @router.post("/start")
-async def start_queue():
+async def start_queue(request: Request):
     """启动队列管理器"""
+    await _parse_body(request, QueueControlRequest)
     try:
         await queue_manager.start()
         return {"message": "队列管理器已启动"}
@@ -39,8 +56,9 @@ async def start_queue():
 
 
 @router.post("/stop")
-async def stop_queue():
+async def stop_queue(request: Request):
     """停止队列管理器"""
+    await _parse_body(request, QueueControlRequest)
     try:
         await queue_manager.stop()
         return {"message": "队列管理器已停止"}
@@ -1,20 +1,69 @@
 """OpenAI服务"""
 import openai
-from typing import Dict, Any, List, AsyncGenerator
+import httpx
+from typing import Dict, Any, List, AsyncGenerator, Awaitable, Callable
 import json
+import orjson
 import asyncio
 import time
+import hashlib
 import logging
+from collections import deque
 
+from ..config import settings
 from ..utils.outline_util import get_random_indexes, calculate_nodes_distribution, generate_one_outline_json_by_level1
-from ..utils.json_util import check_json
+from ..utils.json_util import check_json, build_json_schema
+from ..utils.retry_util import backoff_delay, retry_after_seconds
 from ..utils.config_manager import config_manager
 
 logger = logging.getLogger(__name__)
 
+# 章节内容生成的系统提示词（所有章节共用）
+CHAPTER_CONTENT_SYSTEM_PROMPT = """你是一个专业的标书编写专家，负责为投标文件的技术标部分生成具体内容。
+
+要求：
+1. 内容要专业、准确，与章节标题和描述保持一致
+2. 这是技术方案，不是宣传报告，注意朴实无华，不要假大空
+3. 语言要正式、规范，符合标书写作要求，但不要使用奇怪的连接词，不要让人觉得内容像是AI生成的
+4. 内容要详细具体，避免空泛的描述
+5. 注意避免与同级章节内容重复，保持内容的独特性和互补性
+6. 直接返回章节内容，不生成标题，不要任何额外说明或格式标记
+"""
+
+
+# 按 (api_key, base_url) 共享的异步客户端，复用底层 HTTP 连接池
+# 最多保留 _MAX_CLIENTS 个，超出时淘汰最早创建的；被淘汰的客户端不主动关闭，
+# 仍在使用它的 OpenAIService 实例可以继续完成请求，不再被引用后由垃圾回收释放
+_MAX_CLIENTS = 4
+_clients: Dict[tuple, openai.AsyncOpenAI] = {}
+
+
+def _get_client(api_key: str, base_url: str) -> openai.AsyncOpenAI:
+    """获取（必要时创建）共享的 AsyncOpenAI 客户端"""
+    key = (api_key, base_url)
+    client = _clients.get(key)
+    if client is None:
+        client = openai.AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url if base_url else None,
+            http_client=openai.DefaultAsyncHttpxClient(
+                limits=httpx.Limits(max_keepalive_connections=50, max_connections=100, keepalive_expiry=60)
+            ),
+        )
+        if len(_clients) >= _MAX_CLIENTS:
+            _clients.pop(next(iter(_clients)))
+        _clients[key] = client
+    return client
+
 
 class OpenAIService:
     """OpenAI服务类"""
+
+    # 模型列表缓存，只保留最近一次配置的结果：{"key": (api_key, base_url), "value": 模型列表, "ts": 获取时间}
+    _models_cache: Dict[str, Any] = {}
+
+    # 已确认不支持 json_schema 结构化输出的 (base_url, model_name)
+    _json_schema_unsupported: set = set()
     
     def __init__(self):
         """初始化OpenAI服务，从config_manager读取配置"""
@@ -24,34 +73,44 @@ class OpenAIService:
         self.base_url = config.get('base_url', '')
         self.model_name = config.get('model_name', 'gpt-3.5-turbo')
 
-        # 初始化OpenAI客户端 - 使用异步客户端
-        self.client = openai.AsyncOpenAI(
-            api_key=self.api_key,
-            base_url=self.base_url if self.base_url else None
-        )
+        # 获取共享的OpenAI异步客户端，避免每个实例重新建立连接
+        self.client = _get_client(self.api_key, self.base_url)
     
     async def get_available_models(self) -> List[str]:
-        """获取可用的模型列表"""
+        """获取可用的模型列表，结果按 settings.models_cache_ttl 缓存"""
+        cache_key = (self.api_key, self.base_url)
+        cached = OpenAIService._models_cache
+        if cached.get("key") == cache_key and time.monotonic() - cached["ts"] < settings.models_cache_ttl:
+            return list(cached["value"])
+
         try:
             models = await self.client.models.list()
-            chat_models = []
+            chat_models = set()
             for model in models.data:
                 model_id = model.id.lower()
                 if any(keyword in model_id for keyword in ['gpt', 'claude', 'chat', 'llama', 'qwen', 'deepseek']):
-                    chat_models.append(model.id)
-            return sorted(list(set(chat_models)))
+                    chat_models.add(model.id)
+            result = sorted(chat_models)
+            OpenAIService._models_cache = {"key": cache_key, "value": result, "ts": time.monotonic()}
+            return list(result)
         except Exception as e:
             raise Exception(f"获取模型列表失败: {str(e)}")
-    
+
     async def stream_chat_completion(
         self, 
         messages: list, 
         temperature: float = 0.7,
         response_format: dict = None,
         max_retries: int = 3,
-        retry_delay: float = 20.0
+        retry_delay: float = 20.0,
+        on_status: Callable[[Dict[str, Any]], Awaitable[None]] | None = None
     ) -> AsyncGenerator[str, None]:
-        """流式聊天完成请求 - 带限流重试的异步实现"""
+        """
+        流式聊天完成请求 - 带限流重试的异步实现
+
+        重试/错误等状态通知默认以 "data: {...}" 文本夹在内容流中返回；
+        传入 on_status 时改为调用 on_status(状态dict)，内容流中只包含模型生成的文本
+        """
         last_error = None
         
         for attempt in range(max_retries + 1):
@@ -72,31 +131,54 @@ class OpenAIService:
             except openai.RateLimitError as e:
                 last_error = e
                 if attempt < max_retries:
-                    wait_time = retry_delay * (2 ** attempt)  # 指数退避
+                    # 优先遵循服务端返回的 Retry-After，否则使用带抖动的指数退避
+                    wait_time = retry_after_seconds(e)
+                    if wait_time is None:
+                        wait_time = round(backoff_delay(retry_delay, attempt), 1)
                     logger.warning(f"API限流，第 {attempt + 1} 次重试，等待 {wait_time} 秒: {str(e)}")
-                    yield f"data: {json.dumps({'status': 'rate_limited', 'message': f'API限流，正在重试... ({attempt + 1}/{max_retries})', 'wait_time': wait_time}, ensure_ascii=False)}\n\n"
+                    status = {'status': 'rate_limited', 'message': f'API限流，正在重试... ({attempt + 1}/{max_retries})', 'wait_time': wait_time}
+                    if on_status is not None:
+                        await on_status(status)
+                    else:
+                        yield f"data: {orjson.dumps(status).decode()}\n\n"
                     await asyncio.sleep(wait_time)
                 else:
                     logger.error(f"API限流重试 {max_retries} 次后仍然失败: {str(e)}")
-                    yield f"data: {json.dumps({'status': 'error', 'message': f'API限流重试 {max_retries} 次后失败，请稍后重试'}, ensure_ascii=False)}\n\n"
+                    status = {'status': 'error', 'message': f'API限流重试 {max_retries} 次后失败，请稍后重试'}
+                    if on_status is not None:
+                        await on_status(status)
+                    else:
+                        yield f"data: {orjson.dumps(status).decode()}\n\n"
                     raise Exception(f"API限流重试 {max_retries} 次后失败: {str(e)}")
                     
             except openai.APITimeoutError as e:
                 last_error = e
                 if attempt < max_retries:
-                    wait_time = retry_delay * (2 ** attempt)
+                    wait_time = round(backoff_delay(retry_delay, attempt), 1)
                     logger.warning(f"API超时，第 {attempt + 1} 次重试，等待 {wait_time} 秒: {str(e)}")
-                    yield f"data: {json.dumps({'status': 'timeout', 'message': f'API超时，正在重试... ({attempt + 1}/{max_retries})', 'wait_time': wait_time}, ensure_ascii=False)}\n\n"
+                    status = {'status': 'timeout', 'message': f'API超时，正在重试... ({attempt + 1}/{max_retries})', 'wait_time': wait_time}
+                    if on_status is not None:
+                        await on_status(status)
+                    else:
+                        yield f"data: {orjson.dumps(status).decode()}\n\n"
                     await asyncio.sleep(wait_time)
                 else:
                     logger.error(f"API超时重试 {max_retries} 次后仍然失败: {str(e)}")
-                    yield f"data: {json.dumps({'status': 'error', 'message': f'API超时重试 {max_retries} 次后失败，请检查网络连接'}, ensure_ascii=False)}\n\n"
+                    status = {'status': 'error', 'message': f'API超时重试 {max_retries} 次后失败，请检查网络连接'}
+                    if on_status is not None:
+                        await on_status(status)
+                    else:
+                        yield f"data: {orjson.dumps(status).decode()}\n\n"
                     raise Exception(f"API超时重试 {max_retries} 次后失败: {str(e)}")
                     
             except Exception as e:
                 last_error = e
                 logger.error(f"API调用失败: {str(e)}")
-                yield f"data: {json.dumps({'status': 'error', 'message': f'API调用失败: {str(e)}'}, ensure_ascii=False)}\n\n"
+                status = {'status': 'error', 'message': f'API调用失败: {str(e)}'}
+                if on_status is not None:
+                    await on_status(status)
+                else:
+                    yield f"data: {orjson.dumps(status).decode()}\n\n"
                 raise e
         
         # 如果到达这里，说明所有重试都失败了
@@ -110,14 +192,22 @@ class OpenAIService:
         response_format: dict | None = None,
     ) -> str:
         """收集流式返回的文本到一个完整字符串"""
-        full_content = ""
+        parts: list[str] = []
         async for chunk in self.stream_chat_completion(
             messages,
             temperature=temperature,
             response_format=response_format,
         ):
-            full_content += chunk
-        return full_content
+            parts.append(chunk)
+        return "".join(parts)
+
+    @staticmethod
+    def _is_response_format_error(error: Exception) -> bool:
+        """判断请求错误是否由 response_format（json_schema）参数不被支持引起"""
+        if getattr(error, "param", None) == "response_format":
+            return True
+        message = str(error).lower()
+        return "response_format" in message or "json_schema" in message
 
     async def _generate_with_json_check(
         self,
@@ -138,13 +228,24 @@ class OpenAIService:
         last_error_msg = ""
 
         while True:
-            full_content = await self._collect_stream_text(
-                messages,
-                temperature=temperature,
-                response_format=response_format,
-            )
-
-            isok, error_msg = check_json(str(full_content), schema)
+            try:
+                full_content = await self._collect_stream_text(
+                    messages,
+                    temperature=temperature,
+                    response_format=response_format,
+                )
+            except openai.BadRequestError as e:
+                # 部分兼容接口不支持 json_schema 结构化输出：仅当错误与 response_format 相关时降级为 json_object，
+                # 并记录下来，后续请求直接使用 json_object
+                if not response_format or response_format.get("type") != "json_schema" or not self._is_response_format_error(e):
+                    raise
+                logger.warning(f"{log_prefix} 当前接口不支持 json_schema 结构化输出，改用 json_object: {str(e)}")
+                self._json_schema_unsupported.add((self.base_url, self.model_name))
+                response_format = {"type": "json_object"}
+                continue
+
+            # 校验在线程中执行，避免大响应的解析校验阻塞事件循环上其他章节的流式生成
+            isok, error_msg = await asyncio.to_thread(check_json, str(full_content), schema)
             if isok:
                 return full_content
 
@@ -162,93 +263,138 @@ class OpenAIService:
             print(f"{prefix}check_json 校验失败，进行第 {attempt}/{max_retries} 次重试：{last_error_msg}")
             await asyncio.sleep(0.5)
 
-    async def generate_content_for_outline(self, outline: Dict[str, Any], project_overview: str = "") -> Dict[str, Any]:
-        """为目录结构生成内容"""
+    async def generate_content_for_outline(self, outline: Dict[str, Any], project_overview: str = "") -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        为目录结构生成内容，按章节流式返回生成事件
+
+        不在内存中累积正文，也不修改传入的 outline。
+
+        Yields:
+            {"status": "started", "total": 叶子章节数}
+            {"status": "streaming", "chapter_id": 章节ID, "delta": 内容片段}
+            {"status": "rate_limited" | "timeout", "chapter_id": 章节ID, "message": 提示信息, "wait_time": 等待秒数}
+            {"status": "completed", "chapter_id": 章节ID}
+            {"status": "error", "chapter_id": 章节ID, "message": 错误信息}
+        """
+        if not isinstance(outline, dict) or 'outline' not in outline:
+            raise Exception("无效的outline数据格式")
+
+        # 计算总章节数（叶子节点数）
+        total_leaf_chapters = self._count_leaf_chapters(outline['outline'])
+        logger.info(f"开始为 {len(outline['outline'])} 个主章节生成内容，共 {total_leaf_chapters} 个叶子章节")
+        yield {"status": "started", "total": total_leaf_chapters}
+
+        # 各章节并发生成，生成事件通过有界队列汇总后依次返回；None 表示全部完成。
+        # 客户端读取较慢时队列写满，生成协程在 put 处等待，避免在内存中堆积正文
+        events: asyncio.Queue = asyncio.Queue(maxsize=64)
+
+        async def run():
+            try:
+                await self._process_outline_recursive(outline['outline'], [], project_overview, 0, total_leaf_chapters, events=events)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                await events.put({"status": "error", "message": f"内容生成失败: {str(e)}"})
+            await events.put(None)
+
+        worker = asyncio.create_task(run())
         try:
-            if not isinstance(outline, dict) or 'outline' not in outline:
-                raise Exception("无效的outline数据格式")
-            
-            # 深拷贝outline数据
-            import copy
-            result_outline = copy.deepcopy(outline)
-            
-            # 计算总章节数（叶子节点数）
-            total_leaf_chapters = self._count_leaf_chapters(result_outline['outline'])
-            logger.info(f"开始为 {len(result_outline['outline'])} 个主章节生成内容，共 {total_leaf_chapters} 个叶子章节")
-            
-            # 递归处理目录
-            await self._process_outline_recursive(result_outline['outline'], [], project_overview, 0, total_leaf_chapters)
-            
-            return result_outline
-            
+            while True:
+                event = await events.get()
+                if event is None:
+                    break
+                yield event
+            await worker
         except Exception as e:
             raise Exception(f"处理过程中发生错误: {str(e)}")
+        finally:
+            # 客户端断开等情况下提前结束时，取消尚未完成的生成任务
+            if not worker.done():
+                worker.cancel()
     
     def _count_leaf_chapters(self, chapters: list) -> int:
-        """计算叶子节点数量"""
+        """计算叶子节点数量（迭代遍历，避免递归开销）"""
+        stack = deque(chapters)
         count = 0
-        for chapter in chapters:
-            if 'children' not in chapter or not chapter.get('children'):
-                count += 1
+        while stack:
+            children = stack.pop().get('children')
+            if children:
+                stack.extend(children)
             else:
-                count += self._count_leaf_chapters(chapter['children'])
+                count += 1
         return count
     
-    async def _process_outline_recursive(self, chapters: list, parent_chapters: list = None, project_overview: str = "", chapter_index: int = 0, total_chapters: int = 0):
-        """递归处理章节列表，按顺序生成内容"""
-        for idx, chapter in enumerate(chapters):
+    def _collect_leaf_chapters(self, chapters: list, parent_chapters: list) -> list:
+        """按目录顺序收集叶子节点及其上级章节、同级章节信息（迭代遍历）"""
+        leaves = []
+        # 栈中元素为 (章节, 上级章节列表, 同级章节列表)，逆序入栈以保持目录顺序
+        stack = deque((chapter, parent_chapters, chapters) for chapter in reversed(chapters))
+        while stack:
+            chapter, chapter_parents, siblings = stack.pop()
+            children = chapter.get('children')
+            if not children:
+                leaves.append((chapter, chapter_parents, siblings))
+                continue
+            current_parents = chapter_parents + [{
+                'id': chapter.get('id', 'unknown'),
+                'title': chapter.get('title', '未命名章节'),
+                'description': chapter.get('description', '')
+            }]
+            stack.extend((child, current_parents, children) for child in reversed(children))
+        return leaves
+
+    async def _process_outline_recursive(self, chapters: list, parent_chapters: list = None, project_overview: str = "", chapter_index: int = 0, total_chapters: int = 0, *, events: asyncio.Queue):
+        """处理章节列表，并发生成所有叶子节点内容（并发数受 settings.content_concurrency 限制），生成事件写入 events 队列"""
+        leaves = self._collect_leaf_chapters(chapters, list(parent_chapters or []))
+        # 上级/同级章节条目在各叶子节点间共享，只格式化一次
+        line_cache: Dict[int, str] = {}
+        semaphore = asyncio.Semaphore(max(1, settings.content_concurrency))
+
+        async def generate_one(num: int, chapter: dict, leaf_parent_chapters: list, sibling_chapters: list):
             chapter_id = chapter.get('id', 'unknown')
             chapter_title = chapter.get('title', '未命名章节')
-            
-            # 检查是否为叶子节点
-            is_leaf = 'children' not in chapter or not chapter.get('children', [])
-            
-            # 准备当前章节信息
-            current_chapter_info = {
-                'id': chapter_id,
-                'title': chapter_title,
-                'description': chapter.get('description', '')
-            }
-            
-            # 构建完整的上级章节列表
-            current_parent_chapters = []
-            if parent_chapters:
-                current_parent_chapters.extend(parent_chapters)
-            current_parent_chapters.append(current_chapter_info)
-            
-            current_chapter_num = chapter_index + idx + 1
-            
-            if is_leaf:
-                # 为叶子节点生成内容，传递同级章节信息
+
+            async def on_status(status: Dict[str, Any]):
+                # 限流/超时重试通知作为独立事件发送，不混入章节正文；最终失败由下方 except 统一发送 error 事件
+                if status.get('status') != 'error':
+                    await events.put({**status, "chapter_id": chapter_id})
+
+            async with semaphore:
                 try:
-                    logger.info(f"正在生成第 {current_chapter_num}/{total_chapters} 章内容: {chapter_title}")
-                    content = ""
+                    logger.info(f"正在生成第 {num}/{total_chapters} 章内容: {chapter_title}")
                     async for chunk in self._generate_chapter_content(
-                        chapter, 
-                        current_parent_chapters[:-1],  # 上级章节列表（排除当前章节）
-                        chapters,  # 同级章节列表
-                        project_overview
+                        chapter,
+                        leaf_parent_chapters,  # 上级章节列表（排除当前章节）
+                        sibling_chapters,  # 同级章节列表
+                        project_overview,
+                        line_cache,
+                        on_status
                     ):
-                        content += chunk
-                    if content:
-                        chapter['content'] = content
-                    logger.info(f"第 {current_chapter_num} 章内容生成完成: {chapter_title}")
+                        await events.put({"status": "streaming", "chapter_id": chapter_id, "delta": chunk})
+                    await events.put({"status": "completed", "chapter_id": chapter_id})
+                    logger.info(f"第 {num} 章内容生成完成: {chapter_title}")
                 except Exception as e:
-                    logger.error(f"第 {current_chapter_num} 章内容生成失败: {str(e)}")
-                    chapter['error'] = str(e)
-                    chapter['content'] = f"[内容生成失败: {str(e)}]"
-            else:
-                # 递归处理子章节
-                child_chapters = chapter.get('children', [])
-                await self._process_outline_recursive(
-                    child_chapters, 
-                    current_parent_chapters, 
-                    project_overview,
-                    chapter_index + idx,
-                    total_chapters
-                )
+                    logger.error(f"第 {num} 章内容生成失败: {str(e)}")
+                    await events.put({"status": "error", "chapter_id": chapter_id, "message": f"内容生成失败: {str(e)}"})
+
+        await asyncio.gather(*[
+            generate_one(chapter_index + idx + 1, chapter, leaf_parent_chapters, sibling_chapters)
+            for idx, (chapter, leaf_parent_chapters, sibling_chapters) in enumerate(leaves)
+        ])
     
-    async def _generate_chapter_content(self, chapter: dict, parent_chapters: list = None, sibling_chapters: list = None, project_overview: str = "") -> AsyncGenerator[str, None]:
+    @staticmethod
+    def _format_chapter_line(chapter: dict, line_cache: Dict[int, str] = None) -> str:
+        """格式化上下文中的单个章节条目，line_cache 用于在同一目录的多次调用间复用结果"""
+        if line_cache is not None:
+            line = line_cache.get(id(chapter))
+            if line is not None:
+                return line
+        line = f"- {chapter.get('id', 'unknown')} {chapter.get('title', '未命名')}\n  {chapter.get('description', '')}\n"
+        if line_cache is not None:
+            line_cache[id(chapter)] = line
+        return line
+
+    async def _generate_chapter_content(self, chapter: dict, parent_chapters: list = None, sibling_chapters: list = None, project_overview: str = "", line_cache: Dict[int, str] = None, on_status: Callable[[Dict[str, Any]], Awaitable[None]] | None = None) -> AsyncGenerator[str, None]:
         """
         为单个章节流式生成内容
 
@@ -257,49 +403,42 @@ class OpenAIService:
             parent_chapters: 上级章节列表，每个元素包含章节id、标题和描述
             sibling_chapters: 同级章节列表，避免内容重复
             project_overview: 项目概述信息，提供项目背景和要求
+            line_cache: 章节条目格式化缓存，批量生成同一目录时传入以复用
+            on_status: 重试等状态通知回调，传入时状态通知不再混入内容流（见 stream_chat_completion）
 
         Yields:
             生成的内容流
-        """
-        try:
-            chapter_id = chapter.get('id', 'unknown')
-            chapter_title = chapter.get('title', '未命名章节')
-            chapter_description = chapter.get('description', '')
 
-            # 构建提示词
-            system_prompt = """你是一个专业的标书编写专家，负责为投标文件的技术标部分生成具体内容。
+        Raises:
+            Exception: 生成失败时向上抛出，由调用方决定如何反馈
+        """
+        chapter_id = chapter.get('id', 'unknown')
+        chapter_title = chapter.get('title', '未命名章节')
+        chapter_description = chapter.get('description', '')
 
-要求：
-1. 内容要专业、准确，与章节标题和描述保持一致
-2. 这是技术方案，不是宣传报告，注意朴实无华，不要假大空
-3. 语言要正式、规范，符合标书写作要求，但不要使用奇怪的连接词，不要让人觉得内容像是AI生成的
-4. 内容要详细具体，避免空泛的描述
-5. 注意避免与同级章节内容重复，保持内容的独特性和互补性
-6. 直接返回章节内容，不生成标题，不要任何额外说明或格式标记
-"""
+        # 构建上下文信息
+        context_info = ""
+        
+        # 上级章节信息
+        if parent_chapters:
+            context_info += "上级章节信息：\n" + "".join(
+                self._format_chapter_line(parent, line_cache) for parent in parent_chapters
+            )
+        
+        # 同级章节信息（排除当前章节）
+        if sibling_chapters:
+            context_info += "同级章节信息（请避免内容重复）：\n" + "".join(
+                self._format_chapter_line(sibling, line_cache)
+                for sibling in sibling_chapters
+                if sibling.get('id') != chapter_id  # 排除当前章节
+            )
 
-            # 构建上下文信息
-            context_info = ""
-            
-            # 上级章节信息
-            if parent_chapters:
-                context_info += "上级章节信息：\n"
-                for parent in parent_chapters:
-                    context_info += f"- {parent['id']} {parent['title']}\n  {parent['description']}\n"
-            
-            # 同级章节信息（排除当前章节）
-            if sibling_chapters:
-                context_info += "同级章节信息（请避免内容重复）：\n"
-                for sibling in sibling_chapters:
-                    if sibling.get('id') != chapter_id:  # 排除当前章节
-                        context_info += f"- {sibling.get('id', 'unknown')} {sibling.get('title', '未命名')}\n  {sibling.get('description', '')}\n"
-
-            # 构建用户提示词
-            project_info = ""
-            if project_overview.strip():
-                project_info = f"项目概述信息：\n{project_overview}\n\n"
-            
-            user_prompt = f"""请为以下标书章节生成具体内容：
+        # 构建用户提示词
+        project_info = ""
+        if project_overview.strip():
+            project_info = f"项目概述信息：\n{project_overview}\n\n"
+        
+        user_prompt = f"""请为以下标书章节生成具体内容：
 
 {project_info}{context_info if context_info else ''}当前章节信息：
 章节ID: {chapter_id}
@@ -308,19 +447,15 @@ class OpenAIService:
 
 请根据项目概述信息和上述章节层级关系，生成详细的专业内容，确保与上级章节的内容逻辑相承，同时避免与同级章节内容重复，突出本章节的独特性和技术方案的优势。"""
 
-            # 调用AI流式生成内容
-            messages = [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ]
-
-            # 流式返回生成的文本
-            async for chunk in self.stream_chat_completion(messages, temperature=0.7):
-                yield chunk
+        # 调用AI流式生成内容
+        messages = [
+            {"role": "system", "content": CHAPTER_CONTENT_SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt}
+        ]
 
-        except Exception as e:
-            print(f"生成章节内容时出错: {str(e)}")
-            yield f"错误: {str(e)}"
+        # 流式返回生成的文本
+        async for chunk in self.stream_chat_completion(messages, temperature=0.7, on_status=on_status):
+            yield chunk
             
     async def generate_outline_v2(self, overview: str, requirements: str) -> Dict[str, Any]:
         schema_json = json.dumps([
@@ -378,7 +513,7 @@ class OpenAIService:
         )
 
         # 通过校验后再进行 JSON 解析
-        level_l1 = json.loads(full_content.strip())
+        level_l1 = orjson.loads(full_content)
 
         expected_word_count = 100000
         leaf_node_count = expected_word_count // 1500
@@ -387,13 +522,16 @@ class OpenAIService:
         index1, index2 = get_random_indexes(len(level_l1))
 
         nodes_distribution = calculate_nodes_distribution(len(level_l1), (index1, index2), leaf_node_count)
+
+        # 所有一级标题只构建一次，各章节的 other_outline 通过切片排除自身
+        titles = [f"{j+1}. {node['new_title']}" for j, node in enumerate(level_l1)]
         
         # 顺序生成每个一级节点的提纲，避免API限流
         outline = []
         for i, level1_node in enumerate(level_l1):
             try:
                 logger.info(f"正在生成第 {i+1}/{len(level_l1)} 章提纲: {level1_node['new_title']}")
-                chapter_outline = await self.process_level1_node(i, level1_node, nodes_distribution, level_l1, overview, requirements)
+                chapter_outline = await self.process_level1_node(i, level1_node, nodes_distribution, titles, overview, requirements)
                 outline.append(chapter_outline)
                 logger.info(f"第 {i+1} 章提纲生成完成: {level1_node['new_title']}")
             except Exception as e:
@@ -412,18 +550,18 @@ class OpenAIService:
         
         return {"outline": outline}
     
-    async def process_level1_node(self, i, level1_node, nodes_distribution, level_l1, overview, requirements):
-        """处理单个一级节点的函数"""
+    async def process_level1_node(self, i, level1_node, nodes_distribution, titles, overview, requirements):
+        """处理单个一级节点的函数，titles 为带序号的全部一级标题列表"""
 
         # 生成json
         json_outline = generate_one_outline_json_by_level1(level1_node["new_title"], i + 1, nodes_distribution)
         print(f"正在处理第{i+1}章: {level1_node['new_title']}")
         
         # 其他标题
-        other_outline = "\n".join([f"{j+1}. {node['new_title']}" 
-                            for j, node in enumerate(level_l1) 
-                            if j!= i])
+        other_outline = "\n".join(titles[:i] + titles[i+1:])
 
+        # 系统提示词只包含固定说明和项目信息，所有章节调用完全一致，便于命中服务端前缀缓存；
+        # 随章节变化的 json_outline 和 other_outline 放到用户消息末尾
         system_prompt = f"""
     ### 角色
     你是专业的标书编写专家，擅长根据项目需求编写标书。
@@ -440,11 +578,6 @@ class OpenAIService:
     ### 注意事项
     在原json上补全信息，禁止修改json结构，禁止修改一级标题
 
-    ### Output Format in JSON
-    {json_outline}
-
-    """
-        user_prompt = f"""
     ### 项目信息
 
     <overview>
@@ -454,29 +587,45 @@ class OpenAIService:
     <requirements>
     {requirements}
     </requirements>
-    
+
+    """
+        user_prompt = f"""
     <other_outline>
     {other_outline}
     </other_outline>
 
+    ### Output Format in JSON
+    {json_outline}
+
 
     直接返回json，不要任何额外说明或格式标记
 
     """
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"第{i+1}章系统提示词哈希: {hashlib.sha256(system_prompt.encode()).hexdigest()[:16]}")
         messages = [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt}
         ]
 
+        # 使用严格的 json_schema 结构化输出，保证首次返回即符合结构，check_json 仅作兜底校验
+        if settings.structured_output and (self.base_url, self.model_name) not in self._json_schema_unsupported:
+            response_format = {
+                "type": "json_schema",
+                "json_schema": {"name": "outline", "strict": True, "schema": build_json_schema(json_outline)},
+            }
+        else:
+            response_format = {"type": "json_object"}
+
         # 使用通用方法进行 JSON 校验与重试（失败时不抛异常，保持原有“返回最后一次结果”的行为）
         full_content = await self._generate_with_json_check(
             messages=messages,
             schema=json_outline,
             max_retries=3,
             temperature=0.7,
-            response_format={"type": "json_object"},
+            response_format=response_format,
             log_prefix=f"第{i+1}章",
             raise_on_fail=False,
         )
 
-        return json.loads(full_content.strip())
\ No newline at end of file
+        return orjson.loads(full_content)
\ No newline at end of file
@@ -15,9 +15,24 @@ class ConfigManager:
         
         # 确保配置目录存在
         os.makedirs(self.config_dir, exist_ok=True)
+
+        # 配置缓存：配置文件修改时间不变时直接返回缓存，避免重复解析 .env 和 JSON
+        self._cached_config: Optional[Dict] = None
+        self._cached_mtime: Optional[float] = None
+    
+    def _config_mtime(self) -> Optional[float]:
+        """获取配置文件修改时间，文件不存在时返回 None"""
+        try:
+            return os.stat(self.config_file).st_mtime
+        except OSError:
+            return None
     
     def load_config(self) -> Dict:
-        """从本地JSON文件加载配置"""
+        """从本地JSON文件加载配置（按文件修改时间缓存）"""
+        mtime = self._config_mtime()
+        if self._cached_config is not None and mtime == self._cached_mtime:
+            return dict(self._cached_config)
+
         # 加载 .env 文件（如果存在）
         load_dotenv()
 
@@ -39,7 +54,9 @@ class ConfigManager:
             except Exception:
                 pass  # 如果读取失败，使用默认配置
 
-        return default_config
+        self._cached_config = default_config
+        self._cached_mtime = mtime
+        return dict(default_config)
     
     def save_config(self, api_key: str, base_url: str, model_name: str) -> bool:
         """保存配置到本地JSON文件"""
@@ -51,6 +68,8 @@ class ConfigManager:
         try:
             with open(self.config_file, 'w', encoding='utf-8') as f:
                 json.dump(config, f, ensure_ascii=False, indent=2)
+            # 使缓存失效（修改时间精度不足时也能读到新配置）
+            self._cached_config = None
             return True
         except Exception:
             return False
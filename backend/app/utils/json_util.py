@@ -69,4 +69,42 @@ def check_json(json_str: str, schema: str | dict) -> tuple[bool, str]:
         return is_valid, error if not is_valid else ""
         
     except Exception as e:
-        return False, f"未预期的错误: {str(e)}"
\ No newline at end of file
+        return False, f"未预期的错误: {str(e)}"
+
+def build_json_schema(example: str | dict | list) -> dict:
+    """
+    根据模板 JSON 生成严格模式的 JSON Schema，用于结构化输出（response_format=json_schema）
+    
+    Args:
+        example: 模板 JSON 字符串或对象，规则与 check_json 的 schema 参数一致
+        
+    Returns:
+        dict: JSON Schema，对象的所有键均为必需且不允许额外字段，列表元素按第一个元素的结构约束
+    """
+    if isinstance(example, str):
+        example = json.loads(example)
+    
+    def schema_for(template):
+        if isinstance(template, dict):
+            return {
+                "type": "object",
+                "properties": {key: schema_for(value) for key, value in template.items()},
+                "required": list(template.keys()),
+                "additionalProperties": False,
+            }
+        if isinstance(template, list):
+            return {
+                "type": "array",
+                "items": schema_for(template[0]) if template else {"type": "string"},
+            }
+        if isinstance(template, bool):
+            return {"type": "boolean"}
+        if isinstance(template, int):
+            return {"type": "integer"}
+        if isinstance(template, float):
+            return {"type": "number"}
+        if template is None:
+            return {"type": "null"}
+        return {"type": "string"}
+    
+    return schema_for(example)
@@ -7,8 +7,13 @@ from enum import Enum
 import logging
 from datetime import datetime
 
+from .retry_util import backoff_delay
+
 logger = logging.getLogger(__name__)
 
+# 停止信号：放入队列后唤醒阻塞在 get() 上的处理协程使其退出
+_SENTINEL = object()
+
 class TaskStatus(Enum):
     PENDING = "pending"
     RUNNING = "running"
@@ -33,10 +38,16 @@ class QueueTask:
     created_at: datetime = None
     started_at: datetime = None
     completed_at: datetime = None
+    # 状态变更时预先格式化好的时间字符串，避免每次查询状态都调用 isoformat
+    created_at_iso: Optional[str] = None
+    started_at_iso: Optional[str] = None
+    completed_at_iso: Optional[str] = None
     
     def __post_init__(self):
         if self.created_at is None:
             self.created_at = datetime.now()
+        if self.created_at_iso is None:
+            self.created_at_iso = self.created_at.isoformat()
 
 class QueueManager:
     """队列管理器"""
@@ -58,11 +69,13 @@ class QueueManager:
         """停止队列处理器"""
         self.running = False
         if self._processing_task:
-            self._processing_task.cancel()
+            self._queue.put_nowait(_SENTINEL)
             try:
-                await self._processing_task
-            except asyncio.CancelledError:
+                # 空闲时处理协程收到停止信号后立即退出；正在执行任务时超时取消
+                await asyncio.wait_for(self._processing_task, timeout=1.0)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
                 pass
+            self._processing_task = None
         logger.info("队列管理器已停止")
     
     def add_task(
@@ -87,7 +100,8 @@ class QueueManager:
         )
         
         self.tasks[task_id] = task
-        asyncio.create_task(self._queue.put(task))
+        # 队列无界，put_nowait 不会阻塞，无需为每次入队单独创建 Task
+        self._queue.put_nowait(task)
         
         logger.info(f"任务已添加: {name} (ID: {task_id})")
         return task_id
@@ -98,6 +112,14 @@ class QueueManager:
         if not task:
             return None
         
+        return self._status_dict(task)
+    
+    async def get_all_tasks(self) -> List[Dict]:
+        """获取所有任务状态"""
+        return [self._status_dict(task) for task in self.tasks.values()]
+    
+    def _status_dict(self, task: QueueTask) -> Dict:
+        """构建任务状态字典（纯内存操作，无需await）"""
         return {
             'id': task.id,
             'name': task.name,
@@ -105,16 +127,12 @@ class QueueManager:
             'retry_count': task.retry_count,
             'max_retries': task.max_retries,
             'progress': self._calculate_progress(task),
-            'created_at': task.created_at.isoformat() if task.created_at else None,
-            'started_at': task.started_at.isoformat() if task.started_at else None,
-            'completed_at': task.completed_at.isoformat() if task.completed_at else None,
+            'created_at': task.created_at_iso,
+            'started_at': task.started_at_iso,
+            'completed_at': task.completed_at_iso,
             'error': task.error
         }
     
-    async def get_all_tasks(self) -> List[Dict]:
-        """获取所有任务状态"""
-        return [await self.get_task_status(task_id) for task_id in self.tasks.keys()]
-    
     def _calculate_progress(self, task: QueueTask) -> float:
         """计算任务进度"""
         if task.status == TaskStatus.COMPLETED:
@@ -130,28 +148,37 @@ class QueueManager:
         return 0.0
     
     async def _process_queue(self):
-        """处理队列中的任务"""
+        """处理队列中的任务，阻塞等待新任务，收到停止信号后退出"""
         while self.running:
+            # 获取任务
+            task = await self._queue.get()
             try:
-                # 获取任务
-                task = await asyncio.wait_for(self._queue.get(), timeout=1.0)
+                if task is _SENTINEL:
+                    # 上次停止时残留的停止信号在重新启动后忽略
+                    if not self.running:
+                        break
+                    continue
+                
+                if not self.running:
+                    # 停止后才取到的任务放回队列，保持待执行状态，下次启动时继续处理
+                    self._queue.put_nowait(task)
+                    break
                 
                 # 处理任务
                 await self._execute_task(task)
                 
-                # 标记任务完成
-                self._queue.task_done()
-                
-            except asyncio.TimeoutError:
-                continue
             except Exception as e:
                 logger.error(f"队列处理错误: {e}")
+            finally:
+                # 标记任务完成
+                self._queue.task_done()
     
     async def _execute_task(self, task: QueueTask):
         """执行任务"""
         try:
             task.status = TaskStatus.RUNNING
             task.started_at = datetime.now()
+            task.started_at_iso = task.started_at.isoformat()
             
             logger.info(f"开始执行任务: {task.name} (ID: {task.id})")
             
@@ -163,6 +190,7 @@ class QueueManager:
             
             task.status = TaskStatus.COMPLETED
             task.completed_at = datetime.now()
+            task.completed_at_iso = task.completed_at.isoformat()
             
             logger.info(f"任务完成: {task.name} (ID: {task.id})")
             
@@ -176,14 +204,15 @@ class QueueManager:
                 task.status = TaskStatus.RETRYING
                 logger.warning(f"任务失败，准备重试: {task.name} (ID: {task.id}, 尝试 {task.retry_count}/{task.max_retries})")
                 
-                # 等待重试延迟
-                await asyncio.sleep(task.retry_delay)
+                # 等待重试延迟（带抖动的指数退避）
+                await asyncio.sleep(backoff_delay(task.retry_delay, task.retry_count - 1))
                 
                 # 重新添加到队列
-                await self._queue.put(task)
+                self._queue.put_nowait(task)
             else:
                 task.status = TaskStatus.FAILED
                 task.completed_at = datetime.now()
+                task.completed_at_iso = task.completed_at.isoformat()
                 logger.error(f"任务最终失败: {task.name} (ID: {task.id}, 错误: {error_msg})")
 
 # 全局队列管理器实例
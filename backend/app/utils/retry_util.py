@@ -0,0 +1,38 @@
+import random
+from typing import Optional
+
+
+def backoff_delay(base: float, attempt: int, jitter: float = 0.5, cap: float = 30.0) -> float:
+    """
+    计算带随机抖动的指数退避等待时间，避免并发失败后同时重试
+    
+    先对指数退避时间取上限再加抖动，保证达到上限后各次重试的等待时间仍然分散
+    
+    Args:
+        base: 基础等待时间（秒）
+        attempt: 已重试次数（从0开始）
+        jitter: 抖动比例，实际等待时间在 [1 - jitter, 1] 倍之间
+        cap: 等待时间上限（秒）
+        
+    Returns:
+        float: 等待时间（秒）
+    """
+    return min(cap, base * (2 ** attempt)) * random.uniform(1 - jitter, 1)
+
+
+def retry_after_seconds(error: Exception, cap: float = 30.0) -> Optional[float]:
+    """
+    从异常携带的响应头中读取 Retry-After（秒），不存在或无法解析时返回 None；结果不超过 cap
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        seconds = float(value)
+    except (TypeError, ValueError):
+        return None
+    return min(seconds, cap) if seconds >= 0 else None
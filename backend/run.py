@@ -112,5 +112,8 @@ if __name__ == "__main__":
         port=8000,
         reload=False,  # 多进程模式下不支持reload
         log_level="info",
-        workers=multiprocessing.cpu_count() * 2  # CPU核心数的2倍，最大化并发能力
+        # uvloop 不支持 Windows，Windows 下退回标准 asyncio 事件循环
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        workers=multiprocessing.cpu_count()  # 以异步I/O为主的负载，每核一个进程即可，避免过度订阅
     )
\ No newline at end of file